@@ -79,8 +79,7 @@ def signup():
             "progress": {},
         }
 
-        model.users.append(new_user)
-        model.save_users()
+        model.add_user(new_user)
 
         flash("Registration successful! Please login.", "success")
         return redirect(url_for("login"))
@@ -119,6 +118,42 @@ def courses():
     return render_template("courses.html", courses=courses, user=user)
 
 
+@app.route("/search")
+def search():
+    if "email" not in session:
+        flash("Please login first", "danger")
+        return redirect(url_for("login"))
+
+    query = request.args.get("q", "").strip()
+    doc_type = request.args.get("type") or None
+    results = model.search(query, limit=25, doc_type=doc_type) if query else []
+
+    return render_template("search.html", query=query, doc_type=doc_type, results=results)
+
+
+@app.route("/api/search")
+def api_search():
+    if "email" not in session:
+        return jsonify({"error": "Please login first"}), 401
+
+    query = request.args.get("q", "").strip()
+    doc_type = request.args.get("type") or None
+    try:
+        limit = min(int(request.args.get("limit", 10)), 100)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    return jsonify({"query": query, "results": model.search(query, limit=limit, doc_type=doc_type)})
+
+
+@app.route("/api/stats/user-cache")
+def api_user_cache_stats():
+    if "email" not in session:
+        return jsonify({"error": "Please login first"}), 401
+
+    return jsonify(model.user_cache_stats())
+
+
 @app.route("/enroll-course/<course_name>", methods=["POST"])
 @csrf.exempt  # Keep this if you're still skipping CSRF
 def enroll_course(course_name):
@@ -292,7 +327,9 @@ def pre_assessment(course_name):
         except Exception as e:
             flash(f"Error processing assessment: {str(e)}", "danger")
             app.logger.error(f"Assessment error: {str(e)}")
-            questions = model.generate_pre_assessment(course_name, user["email"])
+            # Re-show the same form so the submitted answers still line up
+            questions = session.get('assessment_questions') or model.generate_pre_assessment(course_name, user["email"])
+            session['assessment_questions'] = questions
             return render_template(
                 "pre_assessment.html",
                 course_name=course_name,
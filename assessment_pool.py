@@ -0,0 +1,169 @@
+import os
+import random
+import threading
+from collections import OrderedDict, defaultdict, deque
+
+FORM_SIZE = 10
+# Forms kept ready per (course, level), and the level at which a refill is queued
+POOL_SIZE = 20
+REFILL_BELOW = 5
+# Questions remembered per user so their next form avoids repeats
+RECENT_QUESTIONS = 30
+# Users whose recent questions are remembered; least recently seen are dropped.
+# LearningModel passes its user cache size.
+RECENT_USERS = 1024
+# How many pooled forms to consider when looking for one the user hasn't seen
+CANDIDATE_FORMS = 5
+
+
+class AssessmentPool:
+    """Pool of pre-generated pre-assessment forms per (course, level).
+
+    `question_source(course_name, level)` returns every question eligible for
+    that course and level. Forms are built from it in a background thread and
+    handed out with take(); each take queues a refill once the pool runs low.
+    """
+
+    def __init__(self, question_source, form_size=FORM_SIZE, pool_size=POOL_SIZE, recent_users=RECENT_USERS):
+        self.question_source = question_source
+        self.form_size = form_size
+        self.pool_size = pool_size
+        self.recent_users = recent_users
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.wakeup = threading.Event()
+        self.worker_pid = None
+        self.reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent's worker thread may have held the lock or been mid-refill
+        # when the process forked; the child starts over with fresh primitives
+        # and a new worker on its next schedule()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = deque()
+        self.worker_pid = None
+
+    def reset(self):
+        """Drop all pooled forms, e.g. after the question bank changes"""
+        with self.lock:
+            self.forms = defaultdict(deque)
+            self.questions = {}
+            self.recent = OrderedDict()
+            self.pending.clear()
+            # Lets fill() discard forms built from a question bank that was since replaced
+            self.generation += 1
+
+    def _key(self, course_name, level):
+        return course_name.lower(), level.lower()
+
+    def _eligible(self, key, course_name, level):
+        if key not in self.questions:
+            self.questions[key] = self.question_source(course_name, level)
+        return self.questions[key]
+
+    def build_form(self, questions):
+        """Sample a form that spreads questions evenly across related submodules"""
+        by_submodule = defaultdict(list)
+        for q in questions:
+            by_submodule[q.get('related_submodule', '')].append(q)
+
+        groups = list(by_submodule.values())
+        for group in groups:
+            random.shuffle(group)
+        random.shuffle(groups)
+
+        # Round-robin across submodules until the form is full
+        form = []
+        while len(form) < min(self.form_size, len(questions)):
+            for group in groups:
+                if group and len(form) < self.form_size:
+                    form.append(group.pop())
+        random.shuffle(form)
+        return form
+
+    def fill(self, course_name, level):
+        key = self._key(course_name, level)
+        with self.lock:
+            generation = self.generation
+            questions = self._eligible(key, course_name, level)
+            missing = self.pool_size - len(self.forms[key])
+        if not questions:
+            return
+
+        forms = [self.build_form(questions) for _ in range(max(0, missing))]
+        with self.lock:
+            if generation == self.generation:
+                self.forms[key].extend(forms)
+
+    def schedule(self, course_name, level):
+        self.pending.append((course_name, level))
+        self._ensure_worker()
+        self.wakeup.set()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so a preforked worker starts its own
+        with self.lock:
+            if self.worker_pid == os.getpid():
+                return
+            self.worker_pid = os.getpid()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            while self.pending:
+                try:
+                    course_name, level = self.pending.popleft()
+                except IndexError:
+                    break
+                self.fill(course_name, level)
+
+    def _pick(self, pooled, seen):
+        """Pop the pooled form with the fewest questions the user saw recently"""
+        best, best_overlap = 0, None
+        for i in range(min(CANDIDATE_FORMS, len(pooled))):
+            overlap = sum(q['question'] in seen for q in pooled[i])
+            if best_overlap is None or overlap < best_overlap:
+                best, best_overlap = i, overlap
+                if overlap == 0:
+                    break
+        form = pooled[best]
+        del pooled[best]
+        return form
+
+    def _recent(self, user_email):
+        """The user's recently served questions, kept in a bounded LRU of users"""
+        recent = self.recent.get(user_email)
+        if recent is None:
+            recent = self.recent[user_email] = deque(maxlen=RECENT_QUESTIONS)
+            while len(self.recent) > self.recent_users:
+                self.recent.popitem(last=False)
+        else:
+            self.recent.move_to_end(user_email)
+        return recent
+
+    def take(self, course_name, level, user_email):
+        key = self._key(course_name, level)
+        with self.lock:
+            pooled = self.forms[key]
+            recent = self._recent(user_email)
+            seen = set(recent)
+            form = self._pick(pooled, seen) if pooled else None
+            running_low = len(pooled) < REFILL_BELOW
+            if form is None:
+                # Pool is cold: build one form inline rather than make the user wait
+                form = self.build_form(self._eligible(key, course_name, level))
+            recent.extend(q['question'] for q in form)
+
+        if running_low:
+            self.schedule(course_name, level)
+        return list(form)
+
+    def stats(self):
+        with self.lock:
+            return {f"{course}/{level}": len(forms) for (course, level), forms in self.forms.items()}
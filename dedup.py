@@ -0,0 +1,121 @@
+import argparse
+import json
+from collections import defaultdict
+
+# Each question is only compared against questions sharing one of its
+# BLOCK_KEYS highest-weighted TF-IDF terms, instead of against every other
+# question in the bank.
+BLOCK_KEYS = 3
+# Blocks bigger than this are split into chunks of this size so a single
+# common term cannot bring back all-pairs comparison. Before splitting, the
+# block is sorted by each row's top-term signature so near-duplicates sit next
+# to each other, and chunks overlap by half so neighbours across a chunk
+# boundary are still compared.
+MAX_BLOCK_SIZE = 2000
+SIGNATURE_TERMS = 6
+
+
+def _candidate_blocks(matrix, block_keys=BLOCK_KEYS):
+    """Return (blocks, signatures): rows grouped by shared top terms, and each row's sort key"""
+    blocks = defaultdict(list)
+    signatures = []
+    matrix = matrix.tocsr()
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        terms = matrix.indices[start:end]
+        ranked = terms[matrix.data[start:end].argsort()[::-1]]
+        for term in ranked[:block_keys]:
+            blocks[term].append(row)
+        signatures.append(tuple(sorted(ranked[:SIGNATURE_TERMS].tolist())))
+    return blocks.values(), signatures
+
+
+def _chunks(block, signatures):
+    if len(block) <= MAX_BLOCK_SIZE:
+        yield block
+        return
+    block = sorted(block, key=lambda row: signatures[row])
+    step = MAX_BLOCK_SIZE // 2
+    for offset in range(0, len(block) - step, step):
+        yield block[offset:offset + MAX_BLOCK_SIZE]
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicate_clusters(texts, threshold=0.8, block_keys=BLOCK_KEYS):
+    """Group near-duplicate texts.
+
+    Returns a list of clusters, each a sorted list of indices into `texts`
+    whose TF-IDF cosine similarity to another member is >= `threshold`.
+    """
+    if len(texts) < 2:
+        return []
+
+    # Imported here so importing this module (and model.py) stays cheap
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True)
+    try:
+        matrix = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Every text was empty or only stop words
+        return []
+
+    parent = list(range(len(texts)))
+    blocks, signatures = _candidate_blocks(matrix, block_keys)
+    for block in blocks:
+        for rows in _chunks(block, signatures):
+            if len(rows) < 2:
+                continue
+            similarity = cosine_similarity(matrix[rows], dense_output=False).tocoo()
+            for i, j, score in zip(similarity.row, similarity.col, similarity.data):
+                if i >= j or score < threshold:
+                    continue
+                a, b = rows[i], rows[j]
+                root_a, root_b = _find(parent, a), _find(parent, b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = defaultdict(list)
+    for i in range(len(texts)):
+        clusters[_find(parent, i)].append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def main():
+    from model import LearningModel
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions across the question bank and module assessments")
+    parser.add_argument('--threshold', type=float, default=0.8, help="cosine similarity at or above which two questions are duplicates")
+    parser.add_argument('--merge', action='store_true',
+                        help="drop question-bank duplicates with the same course, difficulty, options and answer")
+    parser.add_argument('--output', help="where to write the merged question bank (defaults to overwriting it)")
+    args = parser.parse_args()
+
+    model = LearningModel()
+    duplicates = model.find_duplicate_questions(threshold=args.threshold)
+
+    for label, clusters in (("Within-course", duplicates['within_course']),
+                            ("Cross-course (report only)", duplicates['cross_course'])):
+        for n, cluster in enumerate(clusters, start=1):
+            print(f"{label} cluster {n}:")
+            for q in cluster:
+                print(f"  [{q['source']}] {q['course']} / {q['location']}: {q['question']} -> {q['answer']}")
+        print(f"{len(clusters)} {label.lower()} duplicate clusters found\n")
+
+    if args.merge:
+        removed = model.merge_duplicate_questions(duplicates['within_course'])
+        output = args.output or model.question_bank_file
+        with open(output, 'w') as f:
+            json.dump({'question_bank': model.question_bank}, f, indent=2)
+        print(f"Removed {removed} duplicate questions from the question bank, written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must not be imported just by starting the app
+HEAVY_MODULES = ('sklearn', 'numpy', 'scipy')
+
+# (name, statement, fast start, heavy modules allowed). Without fast start the
+# app warms its search index in a background thread, which may already have
+# imported scikit-learn by the time `import app` returns; only the time counts.
+CHECKS = [
+    ('import model', "import model", False, False),
+    ('import app', "import app", False, True),
+    ('import app (fast start)', "import app", True, False),
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'heavy': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def measure(statement, repeat, fast_start=False):
+    """Time `statement` in fresh interpreters and return the best run"""
+    env = dict(os.environ, AI_TUTOR_FAST_START='1' if fast_start else '0')
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check startup import time against a budget")
+    parser.add_argument('--budget-ms', type=float, default=500,
+                        help="maximum time for each check, in milliseconds")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters per check; the best run counts")
+    args = parser.parse_args()
+
+    failed = False
+    for name, statement, fast_start, heavy_allowed in CHECKS:
+        result = measure(statement, args.repeat, fast_start)
+        status = 'ok'
+        if result['ms'] > args.budget_ms:
+            status = 'OVER BUDGET'
+            failed = True
+        if result['heavy'] and not heavy_allowed:
+            status = f"imports {', '.join(result['heavy'])}"
+            failed = True
+        print(f"{name:<30} {result['ms']:>8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode, urlsplit
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+
+class RadioOptionParser(HTMLParser):
+    """Collect the radio button values of an assessment form, keyed by input name"""
+
+    def __init__(self):
+        super().__init__()
+        self.options = defaultdict(list)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'input' and attrs.get('type') == 'radio' and attrs.get('name'):
+            self.options[attrs['name']].append(attrs.get('value', ''))
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    """Surface redirects as responses so each hop is timed as its own request"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class LearnerSession:
+    """One simulated learner: signup, login, enroll, take assessments, view the dashboard"""
+
+    def __init__(self, base_url, stats, course, module_title, think_time=0.0):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.course = course
+        self.module_title = module_title
+        self.think_time = think_time
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), NoRedirectHandler())
+        self.email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        self.password = "loadtest"
+
+    def request(self, route, path, data=None, expect_title=None, expect_redirect=None, follow=None):
+        """Send one request and record its latency under `route`.
+
+        The app renders many failures as a 200 page or a redirect back to a
+        form, so a response only counts as OK when it is the page whose
+        <title> contains `expect_title`, or a redirect to a path starting
+        with `expect_redirect`. With `follow=(route, expect_title)` the
+        redirect target is then fetched as a separately recorded request.
+        """
+        url = self.base_url + path
+        body = urlencode(data).encode() if data is not None else None
+        start = time.perf_counter()
+        html = ''
+        location = None
+        try:
+            with self.opener.open(url, data=body, timeout=30) as response:
+                html = response.read().decode('utf-8', errors='replace')
+            ok = expect_redirect is None
+        except HTTPError as e:
+            location = e.headers.get('Location') if 300 <= e.code < 400 else None
+            ok = location is not None and expect_title is None
+            if location is not None and expect_redirect is not None:
+                ok = urlsplit(location).path.startswith(expect_redirect)
+        except OSError:
+            ok = False
+        if ok and expect_title is not None:
+            ok = f"<title>{expect_title}" in html
+        self.stats.record(route, time.perf_counter() - start, ok)
+
+        if self.think_time:
+            time.sleep(random.uniform(0, self.think_time))
+
+        if follow and location:
+            target = urlsplit(location)
+            follow_route, follow_title = follow
+            return self.request(follow_route, target.path + (f"?{target.query}" if target.query else ''),
+                                expect_title=follow_title)
+        return html
+
+    def answer(self, html):
+        parser = RadioOptionParser()
+        parser.feed(html)
+        return {name: random.choice(values) for name, values in parser.options.items() if values}
+
+    def run(self):
+        course = quote(self.course)
+        module = quote(self.module_title)
+
+        self.request("POST /signup", "/signup", {
+            'name': 'Load Test', 'email': self.email, 'password': self.password
+        }, expect_redirect="/login", follow=("GET /login", "Login"))
+        self.request("POST /login", "/login", {'email': self.email, 'password': self.password},
+                     expect_redirect="/dashboard", follow=("GET /dashboard", "Dashboard"))
+        self.request("POST /enroll-course/<course>", f"/enroll-course/{course}", {},
+                     expect_redirect="/course/", follow=("GET /course/<course>", None))
+
+        html = self.request("GET /pre-assessment/<course>", f"/pre-assessment/{course}",
+                            expect_title="Pre-Assessment")
+        self.request("POST /pre-assessment/<course>", f"/pre-assessment/{course}", self.answer(html),
+                     expect_title="Assessment Results")
+
+        html = self.request("GET /module-assessment/<course>/<module>", f"/module-assessment/{course}/{module}",
+                            expect_title="Module Assessment")
+        self.request("POST /module-assessment/<course>/<module>", f"/module-assessment/{course}/{module}",
+                     self.answer(html), expect_title="Assessment Results")
+
+        self.request("GET /dashboard", "/dashboard", expect_title="Dashboard")
+
+
+def start_local_server(host='127.0.0.1', port=0):
+    """Boot app.py in-process against a throwaway copy of the data directory.
+
+    Returns (base_url, shutdown) so the load test never touches the real users.json.
+    """
+    from werkzeug.serving import make_server
+
+    data_dir = tempfile.mkdtemp(prefix='ai-tutor-loadtest-')
+    for name in ('courses.json', 'question_bank.json', 'users.json'):
+        shutil.copy(os.path.join('data', name), data_dir)
+    if os.path.isdir(os.path.join('data', 'users')):
+        shutil.copytree(os.path.join('data', 'users'), os.path.join(data_dir, 'users'))
+
+    from app import app, model
+    model.users_file = os.path.join(data_dir, 'users.json')
+    model.users_dir = os.path.join(data_dir, 'users')
+    model.courses_file = os.path.join(data_dir, 'courses.json')
+    model.question_bank_file = os.path.join(data_dir, 'question_bank.json')
+    model.load_data()
+
+    # Per-request access logging would dominate the output and skew latencies
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server(host, port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def shutdown():
+        server.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return f"http://{host}:{server.server_port}", shutdown
+
+
+def report(stats, elapsed):
+    print(f"{'route':<45} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    total = 0
+    for route in sorted(stats.latencies):
+        latencies = sorted(stats.latencies[route])
+        total += len(latencies)
+        print(f"{route:<45} {len(latencies):>7} {stats.errors[route]:>7} {len(latencies) / elapsed:>8.1f} "
+              f"{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 90) * 1000:>8.1f} "
+              f"{percentile(latencies, 99) * 1000:>8.1f} {latencies[-1] * 1000:>8.1f}")
+    print(f"\n{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s), "
+          f"{sum(stats.errors.values())} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent learner sessions and report per-route latency")
+    parser.add_argument('--url', help="base URL of a running deployment (default: boot the app in-process)")
+    parser.add_argument('--sessions', type=int, default=50, help="total learner sessions to run")
+    parser.add_argument('--concurrency', type=int, default=10, help="sessions running at the same time")
+    parser.add_argument('--course', default='HTML')
+    parser.add_argument('--module', default='HTML Basics')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="maximum random pause in seconds between a learner's requests")
+    parser.add_argument('--seed', type=int, help="random seed for repeatable runs")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    shutdown = None
+    base_url = args.url
+    if not base_url:
+        base_url, shutdown = start_local_server()
+
+    stats = Stats()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            sessions = [LearnerSession(base_url, stats, args.course, args.module, args.think_time)
+                        for _ in range(args.sessions)]
+            for future in [pool.submit(s.run) for s in sessions]:
+                future.result()
+    finally:
+        elapsed = time.perf_counter() - start
+        if shutdown:
+            shutdown()
+
+    report(stats, elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,40 @@
 import json
 import os
 import random
+import threading
 from collections import defaultdict
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from assessment_pool import AssessmentPool
+from dedup import find_duplicate_clusters
+from search import TOKEN_PATTERN, SearchIndex
+from user_store import SHARD_BY, USER_CACHE_SIZE, USER_SHARDS, UserCache, make_user_store
+
+# By default load_data warms the search index and the assessment pool in
+# background threads. Set AI_TUTOR_FAST_START=1 to skip both, e.g. before
+# preforking workers; they are then built on first use.
+FAST_START = os.environ.get('AI_TUTOR_FAST_START', '').lower() in ('1', 'true', 'yes')
 
 class LearningModel:
-    def __init__(self):
+    def __init__(self, user_cache_size=USER_CACHE_SIZE, fast_start=FAST_START,
+                 user_shards=USER_SHARDS, shard_by=SHARD_BY):
+        self.fast_start = fast_start
+        self.user_shards = user_shards
+        self.shard_by = shard_by
+        self.user_cache = UserCache(user_cache_size)
         self.users_file = os.path.join('data', 'users.json')
+        self.users_dir = os.path.join('data', 'users')
         self.courses_file = os.path.join('data', 'courses.json')
         self.question_bank_file = os.path.join('data', 'question_bank.json')
+        # scikit-learn is slow to import, so the vectorizer is only created on first use
+        self._vectorizer = None
+        self._search_index = None
+        self._search_index_lock = threading.Lock()
+        # Bumped whenever the catalog changes so a build of an older catalog is discarded
+        self._catalog_version = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        self.assessment_pool = AssessmentPool(self._pre_assessment_questions, recent_users=user_cache_size)
         self.load_data()
-        self.vectorizer = TfidfVectorizer(stop_words='english')
         
     def load_data(self):
         with open(self.courses_file) as f:
@@ -21,25 +43,88 @@ class LearningModel:
         with open(self.question_bank_file) as f:
             self.question_bank = json.load(f)['question_bank']
         
-        with open(self.users_file) as f:
-            self.users = json.load(f)
+        # Users are loaded lazily by get_user and held in a bounded LRU cache
+        # and routed to the right shard when user data is sharded
+        self.user_store = make_user_store(self.users_file, self.users_dir,
+                                          shards=self.user_shards, shard_by=self.shard_by)
+        self.user_cache.clear()
+        
+        self._catalog_version += 1
+        self._search_index = None
+        if self.fast_start:
+            self.assessment_pool.reset()
+        else:
+            self.warm_search_index()
+            self.warm_assessment_pool()
+    
+    def _after_fork(self):
+        # A warm-up thread may have held the lock when the process forked; it
+        # does not exist in the child, which builds the index on first search
+        self._search_index_lock = threading.Lock()
+    
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(stop_words='english')
+        return self._vectorizer
     
-    def save_users(self):
-        with open(self.users_file, 'w') as f:
-            json.dump(self.users, f, indent=2)
+    def build_search_index(self):
+        with self._search_index_lock:
+            while self._search_index is None:
+                version = self._catalog_version
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                # Same preprocessing and stop words as the TF-IDF vectorizer, but
+                # keeping short tokens like 'C++' that course names rely on
+                analyzer = TfidfVectorizer(stop_words='english', token_pattern=TOKEN_PATTERN).build_analyzer()
+                search_index = SearchIndex(analyzer)
+                search_index.build(self.courses, self.question_bank)
+                if version == self._catalog_version:
+                    self._search_index = search_index
+            return self._search_index
+    
+    def warm_search_index(self):
+        """Build the search index in a background thread so the first search doesn't pay for it"""
+        threading.Thread(target=self.build_search_index, daemon=True).start()
+    
+    @property
+    def search_index(self):
+        """Search index over the loaded catalog, built on first access"""
+        return self._search_index or self.build_search_index()
+    
+    def warm_assessment_pool(self):
+        """Queue background generation of pre-assessment forms for every course and level"""
+        self.assessment_pool.reset()
+        for topic in self.question_bank:
+            for level in {q['difficulty'].lower() for q in topic['questions']}:
+                self.assessment_pool.schedule(topic['topic'], level)
     
     def get_user(self, email):
-        for user in self.users:
-            if user['email'] == email:
-                return user
-        return None
+        user = self.user_cache.get(email)
+        if user is None:
+            user = self.user_store.get(email)
+            if user is not None:
+                self.user_cache.put(user)
+        return user
+    
+    def add_user(self, user):
+        self.user_store.put(user)
+        self.user_cache.put(user)
     
     def update_user(self, email, updates):
-        for i, user in enumerate(self.users):
-            if user['email'] == email:
-                self.users[i].update(updates)
-                break
-        self.save_users()
+        self._change_user(email, lambda user: user.update(updates))
+    
+    def _change_user(self, email, change):
+        # The cached copy may be stale if another worker wrote since, so the
+        # change is applied to the record re-read from disk under the store's
+        # lock, and the cache is refreshed with the result
+        user = self.user_store.update(email, change)
+        if user is not None:
+            self.user_cache.put(user)
+        return user
+    
+    def user_cache_stats(self):
+        return self.user_cache.stats()
     
     def generate_pre_assessment(self, course_name, user_email):
         user = self.get_user(user_email)
@@ -221,31 +306,127 @@ class LearningModel:
         except Exception as e:
             print(f"Error in evaluate_pre_assessment: {str(e)}")
             raise  # Re-raise the exception to be caught by the route handler
+    
+    def find_duplicate_questions(self, threshold=0.8):
+        """Find near-duplicate questions across the question bank and module assessments.
+        
+        Returns {'within_course': [...], 'cross_course': [...]}. Within-course
+        clusters share a course and difficulty and are candidates for merging;
+        cross-course clusters are the same wording used by different courses
+        (often with different answers) and are only meant to be reported.
+        """
+        questions = []
+        for t, topic in enumerate(self.question_bank):
+            for q_index, q in enumerate(topic['questions']):
+                questions.append({
+                    'source': 'question_bank',
+                    'course': topic['topic'],
+                    'difficulty': q.get('difficulty', '').lower(),
+                    'location': q.get('related_submodule') or q.get('difficulty', ''),
+                    'question': q['question'],
+                    'options': q.get('options', []),
+                    'answer': q.get('answer', ''),
+                    'position': (t, q_index)
+                })
+        for course in self.courses:
+            for module in course['submodules']:
+                for q_index, q in enumerate(module.get('assessment', [])):
+                    questions.append({
+                        'source': 'module',
+                        'course': course['name'],
+                        'difficulty': self._determine_module_level(module['title']),
+                        'location': module['title'],
+                        'question': q['question'],
+                        'options': q.get('options', []),
+                        'answer': q.get('answer', ''),
+                        'position': (module['title'], q_index)
+                    })
+        
+        within_course = []
+        cross_course = []
+        for cluster in find_duplicate_clusters([q['question'] for q in questions], threshold=threshold):
+            members = [questions[i] for i in cluster]
+            if len({q['course'].lower() for q in members}) > 1:
+                cross_course.append(members)
+            
+            groups = defaultdict(list)
+            for q in members:
+                groups[(q['course'].lower(), q['difficulty'])].append(q)
+            within_course.extend(group for group in groups.values() if len(group) > 1)
+        
+        return {'within_course': within_course, 'cross_course': cross_course}
+    
+    def _merge_key(self, question):
+        return (
+            question['course'].lower(),
+            question['difficulty'],
+            tuple(str(o).strip().lower() for o in question['options']),
+            str(question['answer']).strip().lower()
+        )
+    
+    def merge_duplicate_questions(self, clusters):
+        """Drop redundant question-bank entries from within-course duplicate clusters.
+        
+        An entry is only dropped when an earlier one in its cluster has the same
+        course, difficulty, options and answer, so a merge never removes a
+        question another course or level relies on. Module assessments are left
+        alone since they are graded by position. Returns the number removed.
+        """
+        to_remove = set()
+        for cluster in clusters:
+            kept = set()
+            for q in cluster:
+                if q['source'] != 'question_bank':
+                    continue
+                key = self._merge_key(q)
+                if key in kept:
+                    to_remove.add(q['position'])
+                else:
+                    kept.add(key)
+        
+        for t, q_index in sorted(to_remove, reverse=True):
+            del self.question_bank[t]['questions'][q_index]
+        
+        if to_remove:
+            self._catalog_version += 1
+            self._search_index = None
+            if not self.fast_start:
+                self.warm_search_index()
+            self.warm_assessment_pool()
+        return len(to_remove)
+    
+    def search(self, query, limit=10, doc_type=None):
+        """Ranked, prefix-aware search over courses, modules and questions"""
+        return self.search_index.search(query, limit=limit, doc_type=doc_type)
+    
     def get_all_courses(self):
         """Return all courses from the courses data file"""
         return self.courses  # This should return the list of courses you loaded in 
     def enroll_user_in_course(self, email, course_name):
         """Enroll a user in a course and update the JSON file"""
-        for user in self.users:
-            if user['email'] == email:
-                if 'courses_enrolled' not in user:
-                    user['courses_enrolled'] = []
-                if course_name not in user['courses_enrolled']:
-                    user['courses_enrolled'].append(course_name)
-                    
-                    # Initialize progress tracking if not exists
-                    if 'progress' not in user:
-                        user['progress'] = {}
-                    if course_name not in user['progress']:
-                        user['progress'][course_name] = {
-                            'completed_modules': [],
-                            'scores': [],
-                            'weak_topics': []
-                        }
-                    
-                    self.save_users()
-                    return True
-        return False
+        enrolled = False
+        
+        def enroll(user):
+            nonlocal enrolled
+            if 'courses_enrolled' not in user:
+                user['courses_enrolled'] = []
+            if course_name in user['courses_enrolled']:
+                return False
+            user['courses_enrolled'].append(course_name)
+            
+            # Initialize progress tracking if not exists
+            if 'progress' not in user:
+                user['progress'] = {}
+            if course_name not in user['progress']:
+                user['progress'][course_name] = {
+                    'completed_modules': [],
+                    'scores': [],
+                    'weak_topics': []
+                }
+            enrolled = True
+        
+        self._change_user(email, enroll)
+        return enrolled
     
     def generate_pre_assessment(self, course_name, user_email):
         user = self.get_user(user_email)
@@ -254,6 +435,10 @@ class LearningModel:
         
         course_level = user.get('course_levels', {}).get(course_name, 'beginner')
         
+        # Forms are pre-built and balanced across submodules by the pool
+        return self.assessment_pool.take(course_name, course_level, user_email)
+    
+    def _pre_assessment_questions(self, course_name, course_level):
         questions = []
         for topic in self.question_bank:
             if topic['topic'].lower() == course_name.lower():
@@ -268,9 +453,7 @@ class LearningModel:
                             'related_submodule': q.get('related_submodule', '')
                         }
                         questions.append(formatted_question)
-        
-        assessment = random.sample(questions, min(10, len(questions))) if questions else []
-        return assessment
+        return questions
     def evaluate_module_assessment(self, course_name, module_title, user_email, answers):
         user = self.get_user(user_email)
         if not user:
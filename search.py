@@ -0,0 +1,152 @@
+import heapq
+import math
+from bisect import bisect_left
+from collections import defaultdict
+
+# Field weights: a hit in a module title counts for more than a hit in the
+# text of one of its assessment questions.
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'title': 3.0,
+    'tags': 2.0,
+    'text': 1.0,
+}
+
+# BM25 parameters: K1 caps how much repeated hits count, B how strongly long
+# documents (modules with many assessment questions) are penalized.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Prefix matches score a little lower than exact term matches
+PREFIX_WEIGHT = 0.6
+MAX_PREFIX_EXPANSIONS = 50
+
+# TfidfVectorizer's default token_pattern drops one-character tokens and
+# '+'/'#', which would make 'C++' or 'C#' unsearchable
+TOKEN_PATTERN = r"(?u)\b\w[\w+#]*"
+
+
+def _normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+class SearchIndex:
+    """In-memory inverted index over courses, modules and questions."""
+
+    def __init__(self, analyzer):
+        # `analyzer` turns a string into a list of terms; LearningModel passes
+        # TfidfVectorizer(token_pattern=TOKEN_PATTERN).build_analyzer().
+        self.analyzer = analyzer
+        self.documents = []
+        self.postings = defaultdict(dict)
+        self.lengths = []
+        self.average_length = 0.0
+        self.titles = defaultdict(list)
+        self.terms = []
+
+    def build(self, courses, question_bank):
+        self.documents = []
+        self.postings = defaultdict(dict)
+        self.lengths = []
+        self.titles = defaultdict(list)
+
+        for course in courses:
+            self._add({
+                'type': 'course',
+                'course': course['name'],
+                'title': course['name'],
+            }, name=course['name'])
+
+            for module in course.get('submodules', []):
+                self._add({
+                    'type': 'module',
+                    'course': course['name'],
+                    'title': module['title'],
+                    'tags': module.get('tags', []),
+                }, title=module['title'],
+                   tags=' '.join(module.get('tags', [])),
+                   text=' '.join(q['question'] for q in module.get('assessment', [])))
+
+        for topic in question_bank:
+            for q in topic['questions']:
+                self._add({
+                    'type': 'question',
+                    'course': topic['topic'],
+                    'title': q['question'],
+                    'difficulty': q.get('difficulty', ''),
+                    'related_submodule': q.get('related_submodule', ''),
+                }, title=q['question'],
+                   tags=q.get('related_submodule', ''))
+
+        self.terms = sorted(self.postings)
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def _add(self, document, **fields):
+        doc_id = len(self.documents)
+        self.documents.append(document)
+        if document['type'] in ('course', 'module'):
+            self.titles[tuple(self._terms(document['title']))].append(doc_id)
+
+        length = 0.0
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in self._terms(value):
+                postings = self.postings[term]
+                postings[doc_id] = postings.get(doc_id, 0.0) + weight
+                length += weight
+        self.lengths.append(length)
+
+    def _terms(self, value):
+        """Analyzed terms, or the whole normalized string if analysis drops everything"""
+        terms = self.analyzer(value or '')
+        if not terms and _normalize(value):
+            return [_normalize(value)]
+        return terms
+
+    def _idf(self, term):
+        df = len(self.postings[term])
+        return math.log(1 + (len(self.documents) - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, tf, doc_id):
+        norm = 1 - BM25_B + BM25_B * self.lengths[doc_id] / (self.average_length or 1.0)
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+    def _expand_prefix(self, prefix):
+        """Return indexed terms that start with `prefix` (excluding itself)."""
+        matches = []
+        i = bisect_left(self.terms, prefix)
+        while i < len(self.terms) and self.terms[i].startswith(prefix):
+            if self.terms[i] != prefix:
+                matches.append(self.terms[i])
+                if len(matches) >= MAX_PREFIX_EXPANSIONS:
+                    break
+            i += 1
+        return matches
+
+    def search(self, query, limit=10, doc_type=None, prefix=True):
+        terms = self._terms(query)
+        if not terms or not self.documents:
+            return []
+
+        scores = defaultdict(float)
+        for term in set(terms):
+            expansions = [(term, 1.0)]
+            if prefix:
+                expansions += [(t, PREFIX_WEIGHT) for t in self._expand_prefix(term)]
+
+            for indexed_term, boost in expansions:
+                postings = self.postings.get(indexed_term)
+                if not postings:
+                    continue
+                idf = self._idf(indexed_term)
+                for doc_id, weight in postings.items():
+                    scores[doc_id] += boost * idf * self._bm25(weight, doc_id)
+
+        if doc_type:
+            scores = {d: s for d, s in scores.items() if self.documents[d]['type'] == doc_type}
+
+        # A course or module whose title is exactly the query always comes first;
+        # only course and module titles are registered in self.titles
+        exact = set(self.titles.get(tuple(terms), ()))
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[0] in exact, item[1]))
+        return [{**self.documents[doc_id], 'score': round(score, 4)} for doc_id, score in top]
@@ -0,0 +1,16 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A throwaway copy of data/, with the working directory set to its parent"""
+    shutil.copytree(os.path.join(ROOT, 'data'), tmp_path / 'data')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'data'
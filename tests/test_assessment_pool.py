@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+import pytest
+
+from assessment_pool import REFILL_BELOW, AssessmentPool
+
+QUESTIONS = [{'question': f'q{i}', 'related_submodule': f's{i % 3}'} for i in range(12)]
+
+
+def make_pool(**kwargs):
+    return AssessmentPool(lambda course, level: QUESTIONS, form_size=3, **kwargs)
+
+
+def test_forms_cover_submodules_evenly():
+    form = make_pool().build_form(QUESTIONS)
+    assert sorted(q['related_submodule'] for q in form) == ['s0', 's1', 's2']
+
+
+def test_take_refills_pool_when_running_low():
+    pool = make_pool(pool_size=REFILL_BELOW + 1)
+    pool.fill('x', 'y')
+    pool.take('x', 'y', 'a')
+    pool.take('x', 'y', 'a')  # now below REFILL_BELOW, queues a refill
+
+    for _ in range(100):
+        if pool.stats()['x/y'] == REFILL_BELOW + 1:
+            break
+        time.sleep(0.01)
+    assert pool.stats()['x/y'] == REFILL_BELOW + 1
+
+
+def test_take_avoids_recently_seen_questions():
+    pool = make_pool()
+    pool.fill('x', 'y')
+    first = {q['question'] for q in pool.take('x', 'y', 'a')}
+    second = {q['question'] for q in pool.take('x', 'y', 'a')}
+    assert not first & second
+
+
+def test_recent_questions_are_kept_for_a_bounded_number_of_users():
+    pool = make_pool(recent_users=2)
+    for user in ('a', 'b', 'c'):
+        pool.take('x', 'y', user)
+    assert list(pool.recent) == ['b', 'c']
+
+
+def test_fill_discards_forms_built_before_reset():
+    pool = make_pool()
+    building = threading.Event()
+    release = threading.Event()
+    build_form = pool.build_form
+
+    def slow_build(questions):
+        building.set()
+        release.wait()
+        return build_form(questions)
+
+    pool.build_form = slow_build
+    thread = threading.Thread(target=pool.fill, args=('x', 'y'))
+    thread.start()
+    building.wait()
+    pool.reset()
+    release.set()
+    thread.join()
+
+    assert pool.stats() == {}
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_child_can_take_when_fork_happens_under_lock():
+    pool = make_pool()
+    pool.lock.acquire()  # as if the parent's worker thread were mid-fill
+    pid = os.fork()
+    if pid == 0:
+        try:
+            pool.take('x', 'y', 'a')
+            os._exit(0)
+        except BaseException:
+            os._exit(1)
+    pool.lock.release()
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            assert os.waitstatus_to_exitcode(status) == 0
+            return
+        time.sleep(0.05)
+    os.kill(pid, 9)
+    pytest.fail("child deadlocked on the pool lock")
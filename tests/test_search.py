@@ -0,0 +1,21 @@
+from model import LearningModel
+
+
+def test_exact_course_title_ranks_first(data_dir):
+    model = LearningModel(fast_start=True)
+    for query, title in (('html', 'HTML'), ('python', 'Python'), ('C++', 'C++'), ('c++ basics', 'C++ Basics')):
+        assert model.search(query, limit=1)[0]['title'] == title
+
+
+def test_index_is_warmed_in_background_unless_fast_start(data_dir):
+    model = LearningModel(fast_start=False)
+    assert model.build_search_index() is model._search_index
+
+    assert LearningModel(fast_start=True)._search_index is None
+
+
+def test_reload_discards_index_of_previous_catalog(data_dir):
+    model = LearningModel(fast_start=True)
+    old_index = model.search_index
+    model.load_data()
+    assert model.search_index is not old_index
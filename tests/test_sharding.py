@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+from model import LearningModel
+from user_store import MANIFEST_NAME, ShardedUserStore
+
+
+def migrate(data_dir, **kwargs):
+    with open(data_dir / 'users.json') as f:
+        users = json.load(f)
+    ShardedUserStore(str(data_dir / 'users'), **kwargs).import_users(users)
+    return users
+
+
+def test_hash_routing_puts_each_user_in_its_shard(tmp_path):
+    store = ShardedUserStore(str(tmp_path), shards=4)
+    emails = [f'user{i}@example.com' for i in range(20)]
+    for email in emails:
+        store.put({'email': email})
+
+    for email in emails:
+        assert store.get(email) == {'email': email}
+        with open(store.shard_path(email)) as f:
+            assert email in {u['email'] for u in json.load(f)}
+    assert len(store.shard_paths()) <= 4
+
+
+def test_tenant_routing_uses_one_file_per_domain(tmp_path):
+    store = ShardedUserStore(str(tmp_path), shard_by='tenant')
+    store.put({'email': 'a@one.edu'})
+    store.put({'email': 'b@two.edu'})
+
+    assert [os.path.basename(p) for p in store.shard_paths()] == ['one.edu.json', 'two.edu.json']
+    assert store.get('b@two.edu') == {'email': 'b@two.edu'}
+
+
+def test_mismatched_manifest_is_refused(tmp_path):
+    ShardedUserStore(str(tmp_path), shards=4).put({'email': 'a@example.com'})
+
+    with pytest.raises(ValueError):
+        ShardedUserStore(str(tmp_path), shards=8)
+    with pytest.raises(ValueError):
+        ShardedUserStore(str(tmp_path), shard_by='tenant')
+    assert ShardedUserStore(str(tmp_path), shards=4).get('a@example.com')
+
+
+def test_shard_files_without_manifest_are_refused(tmp_path):
+    ShardedUserStore(str(tmp_path), shards=4).put({'email': 'a@example.com'})
+    os.remove(tmp_path / MANIFEST_NAME)
+
+    with pytest.raises(ValueError):
+        ShardedUserStore(str(tmp_path), shards=4)
+
+
+def test_sharding_before_migration_is_refused(data_dir):
+    with pytest.raises(ValueError):
+        LearningModel(fast_start=True, user_shards=8)
+    assert not (data_dir / 'users' / MANIFEST_NAME).exists()
+
+
+def test_model_reads_and_writes_migrated_shards(data_dir):
+    users = migrate(data_dir, shards=8)
+    model = LearningModel(fast_start=True, user_shards=8)
+
+    for user in users:
+        assert model.get_user(user['email'])['name'] == user['name']
+    assert model.enroll_user_in_course('user1@gmail.com', 'NewCourseX')
+    assert 'NewCourseX' in LearningModel(fast_start=True, user_shards=8).get_user('user1@gmail.com')['courses_enrolled']
@@ -0,0 +1,70 @@
+import json
+
+from model import LearningModel
+from user_store import JsonUserStore, UserCache
+
+
+def test_update_applies_to_fresh_record_across_workers(data_dir):
+    email = 'john.doe@example.com'
+    worker_a = LearningModel(fast_start=True)
+    worker_b = LearningModel(fast_start=True)
+    worker_b.get_user(email)  # worker B now holds a cached copy
+
+    assert worker_a.enroll_user_in_course(email, 'NewCourseX')
+    worker_b.update_user(email, {'topics_weak': ['Loops']})
+
+    user = LearningModel(fast_start=True).get_user(email)
+    assert 'NewCourseX' in user['courses_enrolled']
+    assert user['topics_weak'] == ['Loops']
+    # Worker B's cache was refreshed with what it wrote
+    assert 'NewCourseX' in worker_b.get_user(email)['courses_enrolled']
+
+
+def test_enroll_is_idempotent(data_dir):
+    model = LearningModel(fast_start=True)
+    assert model.enroll_user_in_course('user1@gmail.com', 'Brand New')
+    assert not model.enroll_user_in_course('user1@gmail.com', 'Brand New')
+    assert not model.enroll_user_in_course('nobody@example.com', 'Brand New')
+
+
+def test_write_through_to_file(data_dir):
+    model = LearningModel(fast_start=True)
+    model.add_user({'name': 'New', 'email': 'new@example.com', 'password': 'x'})
+    model.update_user('new@example.com', {'name': 'Renamed'})
+
+    with open(data_dir / 'users.json') as f:
+        users = {u['email']: u for u in json.load(f)}
+    assert users['new@example.com']['name'] == 'Renamed'
+
+
+def test_negative_cache_sees_writes_from_another_store(tmp_path):
+    path = str(tmp_path / 'users.json')
+    reader = JsonUserStore(path)
+    assert reader.get('late@example.com') is None
+    assert 'late@example.com' in reader.missing
+
+    JsonUserStore(path).put({'email': 'late@example.com'})
+    assert reader.get('late@example.com') == {'email': 'late@example.com'}
+
+
+def test_put_leaves_no_temp_files(tmp_path):
+    store = JsonUserStore(str(tmp_path / 'users.json'))
+    for i in range(5):
+        store.put({'email': f'{i}@example.com'})
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix == '.tmp') == []
+    assert len(store._read()) == 5
+
+
+def test_user_cache_evicts_least_recently_used():
+    cache = UserCache(max_size=2)
+    cache.put({'email': 'a'})
+    cache.put({'email': 'b'})
+    cache.get('a')
+    cache.put({'email': 'c'})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['size'] == 2
+    assert stats['hits'] == 2 and stats['misses'] == 1
@@ -0,0 +1,351 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads within one process are serialized
+    fcntl = None
+
+USER_CACHE_SIZE = 1024
+# Emails known not to exist, remembered so repeated failed logins and signup
+# checks don't re-read the whole file
+MISSING_CACHE_SIZE = 1024
+
+# Sharding is off unless AI_TUTOR_USER_SHARDS is set (hash sharding) or
+# AI_TUTOR_SHARD_BY=tenant (one shard per email domain).
+USER_SHARDS = int(os.environ.get('AI_TUTOR_USER_SHARDS', '0') or 0)
+SHARD_BY = os.environ.get('AI_TUTOR_SHARD_BY', 'hash').lower()
+# Records how a shard directory was laid out so a later run with different
+# settings can't silently route users to the wrong file
+MANIFEST_NAME = 'shards.manifest'
+HASH_SHARD_NAME = re.compile(r'^shard-\d{3}\.json$')
+
+
+class JsonUserStore:
+    """Reads and writes individual user records in a users.json file.
+
+    Nothing but a small set of unknown emails is kept in memory between calls;
+    the file is the source of truth. Writes hold an exclusive flock on a
+    sidecar .lock file so separate worker processes never interleave their
+    read-modify-write cycles.
+
+    The file is a single JSON list, so every lookup that misses the negative
+    cache and every write still parses the whole file: memory during those
+    calls scales with the users in this file, not with active users. Shard
+    the users (ShardedUserStore) to keep each file small.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.missing = OrderedDict()
+        self.missing_stamp = None
+
+    @contextmanager
+    def locked(self):
+        """Hold the thread lock and, where available, an inter-process file lock"""
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _write(self, users):
+        # Write to a unique temp file and swap it in so readers never see a
+        # half-written file and concurrent writers never share a temp file
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(users, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, email):
+        with self.lock:
+            # Any write, from this process or another, invalidates the negative cache
+            stamp = self._stamp()
+            if stamp != self.missing_stamp:
+                self.missing.clear()
+                self.missing_stamp = stamp
+            if email in self.missing:
+                self.missing.move_to_end(email)
+                return None
+
+        # Readers need no lock since writers swap in complete files with
+        # os.replace, so a slow parse doesn't block other lookups
+        for user in self._read():
+            if user['email'] == email:
+                return user
+
+        with self.lock:
+            if stamp == self.missing_stamp:
+                self.missing[email] = True
+                while len(self.missing) > MISSING_CACHE_SIZE:
+                    self.missing.popitem(last=False)
+        return None
+
+    def update(self, email, change):
+        """Apply `change` to the current on-disk record under the write lock.
+
+        `change(user)` mutates the freshly read record in place; returning
+        False from it skips the write. Returns the updated record, or None
+        when there is no user with that email.
+        """
+        with self.locked():
+            users = self._read()
+            for user in users:
+                if user['email'] == email:
+                    if change(user) is not False:
+                        self._write(users)
+                    return user
+        return None
+
+    def put(self, user):
+        """Insert or replace the record with the same email"""
+        with self.locked():
+            self.missing.pop(user['email'], None)
+            users = self._read()
+            for i, existing in enumerate(users):
+                if existing['email'] == user['email']:
+                    users[i] = user
+                    break
+            else:
+                users.append(user)
+            self._write(users)
+
+
+class ShardedUserStore:
+    """Spreads user records over several JsonUserStore files, each with its own lock.
+
+    With shard_by='hash' a record lives in one of `shards` files picked from a
+    stable hash of the email. With shard_by='tenant' every email domain gets its
+    own file, so one institution's writes never contend with another's and each
+    can be backed up or restored on its own.
+
+    The layout is recorded in a manifest in `directory` on first write, and a
+    store whose settings disagree with an existing manifest refuses to start.
+    So does a store with no manifest while `unmigrated_file` (the unsharded
+    users.json) still holds users, since they would all be invisible.
+    """
+
+    def __init__(self, directory, shards=1, shard_by='hash', unmigrated_file=None):
+        if shard_by not in ('hash', 'tenant'):
+            raise ValueError(f"Unknown shard_by {shard_by!r}, expected 'hash' or 'tenant'")
+        if shard_by == 'hash' and shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.directory = directory
+        self.shards = shards
+        self.shard_by = shard_by
+        self.unmigrated_file = unmigrated_file
+        self.stores = {}
+        self.lock = threading.Lock()
+        self.manifest_checked = False
+        self._check_manifest()
+
+    @property
+    def manifest(self):
+        if self.shard_by == 'tenant':
+            return {'shard_by': 'tenant'}
+        return {'shard_by': 'hash', 'shards': self.shards}
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def _check_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                existing = json.load(f)
+            if existing != self.manifest:
+                raise ValueError(
+                    f"User shards in {self.directory} were written with {existing}, but this store "
+                    f"is configured for {self.manifest}; set AI_TUTOR_USER_SHARDS / AI_TUTOR_SHARD_BY to match"
+                )
+            self.manifest_checked = True
+        elif os.path.isdir(self.directory) and any(
+                name.endswith('.json') for name in os.listdir(self.directory)):
+            raise ValueError(
+                f"{self.directory} holds shard files but no {MANIFEST_NAME}; "
+                f"re-run the migration (python user_store.py) to record the layout"
+            )
+        elif self.unmigrated_file and JsonUserStore(self.unmigrated_file)._read():
+            raise ValueError(
+                f"Sharding is enabled but the users in {self.unmigrated_file} have not been migrated "
+                f"to {self.directory}; run python user_store.py with the same settings first"
+            )
+
+    def _write_manifest(self):
+        with self.lock:
+            if self.manifest_checked:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.manifest_path):
+                self._check_manifest()
+                return
+            with open(self.manifest_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            self.manifest_checked = True
+
+    def shard_name(self, email):
+        email = email.strip().lower()
+        if self.shard_by == 'tenant':
+            domain = email.rpartition('@')[2] or 'default'
+            return re.sub(r'[^a-z0-9._-]', '_', domain)
+        digest = hashlib.sha1(email.encode('utf-8')).hexdigest()
+        return f"shard-{int(digest, 16) % self.shards:03d}"
+
+    def shard_path(self, email):
+        return os.path.join(self.directory, self.shard_name(email) + '.json')
+
+    def _is_shard_file(self, name):
+        if self.shard_by == 'hash':
+            return bool(HASH_SHARD_NAME.match(name))
+        return name.endswith('.json') and not HASH_SHARD_NAME.match(name)
+
+    def shard_paths(self):
+        """Every shard file of the active mode on disk, e.g. for per-shard backups"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name)
+                      for name in os.listdir(self.directory) if self._is_shard_file(name))
+
+    def _store(self, email):
+        name = self.shard_name(email)
+        with self.lock:
+            if name not in self.stores:
+                self.stores[name] = JsonUserStore(os.path.join(self.directory, name + '.json'))
+            return self.stores[name]
+
+    def get(self, email):
+        return self._store(email).get(email)
+
+    def put(self, user):
+        self._write_manifest()
+        self._store(user['email']).put(user)
+
+    def update(self, email, change):
+        return self._store(email).update(email, change)
+
+    def import_users(self, users):
+        """Write a list of user records into their shards, one write per shard"""
+        self._write_manifest()
+        by_shard = OrderedDict()
+        for user in users:
+            by_shard.setdefault(self.shard_name(user['email']), []).append(user)
+
+        for name, shard_users in by_shard.items():
+            store = self._store(shard_users[0]['email'])
+            with store.locked():
+                existing = {u['email']: u for u in store._read()}
+                existing.update((u['email'], u) for u in shard_users)
+                store._write(list(existing.values()))
+        return {name: len(shard_users) for name, shard_users in by_shard.items()}
+
+
+def make_user_store(users_file, users_dir, shards=USER_SHARDS, shard_by=SHARD_BY):
+    """The single users.json store, or a sharded one when sharding is configured"""
+    if shard_by == 'tenant' or shards > 1:
+        return ShardedUserStore(users_dir, shards=shards, shard_by=shard_by, unmigrated_file=users_file)
+    return JsonUserStore(users_file)
+
+
+class UserCache:
+    """Size-bounded LRU cache of user records keyed by email"""
+
+    def __init__(self, max_size=USER_CACHE_SIZE):
+        self.max_size = max_size
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, email):
+        with self.lock:
+            user = self.users.get(email)
+            if user is None:
+                self.misses += 1
+                return None
+            self.users.move_to_end(email)
+            self.hits += 1
+            return user
+
+    def put(self, user):
+        with self.lock:
+            self.users[user['email']] = user
+            self.users.move_to_end(user['email'])
+            while len(self.users) > self.max_size:
+                self.users.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.users),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a users.json file into per-shard files")
+    parser.add_argument('--source', default=os.path.join('data', 'users.json'))
+    parser.add_argument('--directory', default=os.path.join('data', 'users'))
+    parser.add_argument('--shards', type=int, default=USER_SHARDS or 8,
+                        help="number of hash shards; the app must run with the same AI_TUTOR_USER_SHARDS")
+    parser.add_argument('--by', choices=('hash', 'tenant'), default=SHARD_BY)
+    args = parser.parse_args()
+
+    with open(args.source) as f:
+        users = json.load(f)
+
+    try:
+        store = ShardedUserStore(args.directory, shards=args.shards, shard_by=args.by)
+    except ValueError as e:
+        parser.error(str(e))
+    for name, count in store.import_users(users).items():
+        print(f"{name}: {count} users")
+    print(f"Wrote {len(users)} users to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()